@@ -0,0 +1,465 @@
+import argparse
+import bisect
+import heapq
+import mmap
+import os
+import re
+import statistics
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import chain
+
+# Polars is optional: when available the aggregation runs as vectorized
+# columnar expressions instead of per-session Python loops, which is much
+# faster on logs with many thousands of sessions.
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# Log line patterns, compiled once at module scope so the per-line hot loop
+# in parse_log_file uses the Pattern objects directly instead of going
+# through re's internal cache on every call. They are byte patterns: the log
+# is mmap'd and walked as raw byte slices, so nothing is decoded per line.
+_DUR_RE = re.compile(rb'duration (\d{2}):(\d{2}\.\d+)')
+_LANG_RE = re.compile(rb"Detected language '(\w+)' with probability (\d+\.\d+)")
+
+# One alternation regex does double duty: it prefilters non-event lines and
+# its named groups say which event matched, so classification is a single
+# C-level search plus a dict lookup instead of a ladder of substring scans.
+_EVENT_RE = re.compile(
+    rb"(?P<received>Voice message received)"
+    rb"|(?P<downloaded>File downloaded!)"
+    rb"|(?P<converting>Converting )"
+    rb"|(?P<transcribing>Transcribing file)"
+    rb"|(?P<audio>Processing audio with duration)"
+    rb"|(?P<language>Detected language)"
+    rb"|(?P<sent>Sending message)"
+)
+
+HISTOGRAM_BUCKETS = [0, 5, 10, 15, 20, 30, 60]
+
+
+@dataclass(slots=True)
+class TranscriptionSession:
+    """Timing info for one voice message, reconstructed from log lines.
+
+    Slotted so thousands of parsed sessions don't each carry a per-instance
+    __dict__ and attribute reads in the aggregation pass skip the dict lookup.
+    """
+    received_at: datetime = None
+    downloaded_at: datetime = None
+    conversion_started_at: datetime = None
+    transcription_started_at: datetime = None
+    sent_at: datetime = None
+    last_seen_at: datetime = None
+    audio_duration: float = None
+    detected_language: str = None
+    language_probability: float = None
+
+    @property
+    def download_time_seconds(self):
+        if self.received_at and self.downloaded_at:
+            return (self.downloaded_at - self.received_at).total_seconds()
+        return None
+
+    @property
+    def conversion_time_seconds(self):
+        if self.conversion_started_at and self.transcription_started_at:
+            return (self.transcription_started_at - self.conversion_started_at).total_seconds()
+        return None
+
+    @property
+    def transcription_time_seconds(self):
+        if self.transcription_started_at and self.sent_at:
+            return (self.sent_at - self.transcription_started_at).total_seconds()
+        return None
+
+    @property
+    def total_time_seconds(self):
+        if self.received_at and self.sent_at:
+            return (self.sent_at - self.received_at).total_seconds()
+        return None
+
+    @property
+    def audio_duration_seconds(self):
+        return self.audio_duration
+
+    @property
+    def realtime_factor(self):
+        transcription = self.transcription_time_seconds
+        if self.audio_duration and transcription and transcription > 0:
+            return self.audio_duration / transcription
+        return None
+
+
+def parse_timestamp(line):
+    """Extract the log timestamp at the start of a byte line, or None.
+
+    Slices fixed offsets out of the "YYYY-MM-DD HH:MM:SS,mmm" prefix instead
+    of datetime.strptime, which re-parses the format string on every call and
+    dominates per-line cost on big logs. The prefilter in parse_log_file
+    guarantees the layout before we get here; int() takes the ASCII byte
+    slices directly so nothing needs decoding.
+    """
+    try:
+        return datetime(
+            int(line[0:4]), int(line[5:7]), int(line[8:10]),
+            int(line[11:13]), int(line[14:16]), int(line[17:19]),
+            int(line[20:23]) * 1000,
+        )
+    except ValueError:
+        return None
+
+
+def parse_audio_duration(line):
+    """Extract the audio duration in seconds from faster-whisper's 'Processing audio with duration MM:SS.mmm' line."""
+    match = _DUR_RE.search(line)
+    if not match:
+        return None
+    return int(match.group(1)) * 60 + float(match.group(2))
+
+
+def parse_language(line):
+    """Extract (language, probability) from the detected-language line."""
+    match = _LANG_RE.search(line)
+    if not match:
+        return None, None
+    return match.group(1).decode("ascii"), float(match.group(2))
+
+
+def _on_downloaded(session, timestamp, line):
+    session.downloaded_at = timestamp
+
+
+def _on_converting(session, timestamp, line):
+    session.conversion_started_at = timestamp
+
+
+def _on_transcribing(session, timestamp, line):
+    session.transcription_started_at = timestamp
+
+
+def _on_audio(session, timestamp, line):
+    session.audio_duration = parse_audio_duration(line)
+
+
+def _on_language(session, timestamp, line):
+    lang, prob = parse_language(line)
+    if lang:
+        session.detected_language = lang
+        session.language_probability = prob
+
+
+# Field-setting events, keyed by the _EVENT_RE group that matched. The
+# "received" and "sent" groups manage the session lifecycle and are handled
+# inline in parse_log_file.
+_HANDLERS = {
+    "downloaded": _on_downloaded,
+    "converting": _on_converting,
+    "transcribing": _on_transcribing,
+    "audio": _on_audio,
+    "language": _on_language,
+}
+
+
+def parse_log_file(filepath):
+    """Parse a bot.log file into a list of TranscriptionSession objects."""
+    sessions = []
+    current = None
+
+    def finalize():
+        nonlocal current
+        if current is not None:
+            # Session never saw "Sending message" (e.g. streaming edits or a
+            # crash); fall back to the last event we saw for it.
+            if current.sent_at is None:
+                current.sent_at = current.last_seen_at
+            sessions.append(current)
+            current = None
+
+    # Map the file read-only and walk raw byte slices: no per-line decode,
+    # no TextIOWrapper buffering, and no str allocation for skipped lines.
+    # mmap can't map an empty file, and a missing one (fresh install, wrong
+    # path) just means zero sessions — main() prints the friendly message.
+    try:
+        if os.path.getsize(filepath) == 0:
+            return sessions
+        with open(filepath, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except OSError:
+        return sessions
+    try:
+        size = len(mm)
+        pos = 0
+        while pos < size:
+            nl = mm.find(b"\n", pos)
+            if nl == -1:
+                line = mm[pos:size]
+                pos = size
+            else:
+                line = mm[pos:nl]
+                pos = nl + 1
+            if line.endswith(b"\r"):
+                line = line[:-1]
+            # Cheap prefilter: log lines start with "YYYY-MM-DD ..." and are
+            # at least timestamp-sized; reject everything else without
+            # touching a regex.
+            if len(line) < 23 or line[4:5] != b"-":
+                continue
+            match = _EVENT_RE.search(line)
+            if match is None:
+                # Not a session event, but segment lines etc. still advance
+                # the last-seen timestamp used by the EOF/crash fallback.
+                if current is not None:
+                    timestamp = parse_timestamp(line)
+                    if timestamp is not None:
+                        current.last_seen_at = timestamp
+                continue
+            timestamp = parse_timestamp(line)
+            if timestamp is None:
+                continue
+            kind = match.lastgroup
+            if kind == "received":
+                # Don't let the new session's arrival bump the previous
+                # session's last_seen_at: the idle gap between messages is
+                # not processing time, and finalize() uses last_seen_at as
+                # the sent_at fallback.
+                finalize()
+                current = TranscriptionSession(received_at=timestamp, last_seen_at=timestamp)
+                continue
+            if current is None:
+                continue
+            current.last_seen_at = timestamp
+            if kind == "sent":
+                current.sent_at = timestamp
+                sessions.append(current)
+                current = None
+            else:
+                _HANDLERS[kind](current, timestamp, line)
+    finally:
+        mm.close()
+    finalize()
+    return sessions
+
+
+def calculate_stats(values):
+    """Return min/max/mean/median/stdev for a list of numbers."""
+    return {
+        "min": min(values),
+        "max": max(values),
+        "mean": statistics.mean(values),
+        "median": statistics.median(values),
+        "stdev": statistics.stdev(values) if len(values) > 1 else 0.0,
+    }
+
+
+def summarize_python(sessions):
+    """Aggregate session metrics with plain Python loops."""
+    total_times = []
+    download_times = []
+    conversion_times = []
+    transcription_times = []
+    audio_durations = []
+    realtime_factors = []
+    languages = Counter()
+    daily_stats = defaultdict(list)
+
+    # One fused pass over the sessions: each timing property is computed
+    # exactly once and feeds every aggregate, instead of six separate
+    # comprehensions re-walking the list and re-invoking the properties.
+    for s in sessions:
+        total = s.total_time_seconds
+        if total:
+            total_times.append(total)
+            daily_stats[s.received_at.date()].append(total)
+        download = s.download_time_seconds
+        if download:
+            download_times.append(download)
+        conversion = s.conversion_time_seconds
+        if conversion:
+            conversion_times.append(conversion)
+        transcription = s.transcription_time_seconds
+        if transcription:
+            transcription_times.append(transcription)
+        audio = s.audio_duration_seconds
+        if audio:
+            audio_durations.append(audio)
+        realtime = s.realtime_factor
+        if realtime:
+            realtime_factors.append(realtime)
+        if s.detected_language:
+            languages[s.detected_language] += 1
+
+    metrics = {
+        "Total": total_times,
+        "Download": download_times,
+        "Conversion": conversion_times,
+        "Transcription": transcription_times,
+        "Audio duration": audio_durations,
+    }
+    stats = {label: calculate_stats(values) for label, values in metrics.items() if values}
+
+    # Histogram of total processing time: one O(log B) bisect per value
+    # instead of scanning every bucket boundary per session.
+    bucket_counts = [0] * len(HISTOGRAM_BUCKETS)
+    for t in total_times:
+        idx = bisect.bisect_right(HISTOGRAM_BUCKETS, t) - 1
+        bucket_counts[max(idx, 0)] += 1
+
+    return {
+        "count": len(sessions),
+        "stats": stats,
+        "realtime_mean": statistics.mean(realtime_factors) if realtime_factors else None,
+        "bucket_counts": bucket_counts,
+        "languages": languages.most_common(),
+        "daily": [(day, len(daily_stats[day]), statistics.mean(daily_stats[day]))
+                  for day in sorted(daily_stats)],
+    }
+
+
+def summarize_polars(sessions):
+    """Aggregate session metrics with vectorized Polars expressions."""
+    df = pl.DataFrame({
+        "start": [s.received_at for s in sessions],
+        "total": [s.total_time_seconds for s in sessions],
+        "download": [s.download_time_seconds for s in sessions],
+        "conversion": [s.conversion_time_seconds for s in sessions],
+        "transcription": [s.transcription_time_seconds for s in sessions],
+        "audio": [s.audio_duration_seconds for s in sessions],
+        "realtime": [s.realtime_factor for s in sessions],
+        "lang": [s.detected_language for s in sessions],
+    })
+
+    stats = {}
+    for label, col in (("Total", "total"), ("Download", "download"),
+                       ("Conversion", "conversion"), ("Transcription", "transcription"),
+                       ("Audio duration", "audio")):
+        series = df[col].drop_nulls()
+        if len(series) == 0:
+            continue
+        stats[label] = {
+            "min": series.min(),
+            "max": series.max(),
+            "mean": series.mean(),
+            "median": series.median(),
+            "stdev": series.std() if len(series) > 1 else 0.0,
+        }
+
+    totals = df["total"].drop_nulls()
+    bucket_counts = [0] * len(HISTOGRAM_BUCKETS)
+    for i in range(len(HISTOGRAM_BUCKETS) - 1):
+        bucket_counts[i] = int(((totals >= HISTOGRAM_BUCKETS[i]) & (totals < HISTOGRAM_BUCKETS[i + 1])).sum())
+    bucket_counts[-1] = int((totals >= HISTOGRAM_BUCKETS[-1]).sum())
+
+    langs = df["lang"].drop_nulls()
+    languages = []
+    if len(langs):
+        counts = langs.value_counts(sort=True)
+        languages = list(zip(counts["lang"].to_list(), counts["count"].to_list()))
+
+    day_df = (
+        df.filter(pl.col("total").is_not_null())
+        .group_by(pl.col("start").dt.date().alias("day"))
+        .agg(pl.col("total").count().alias("count"), pl.col("total").mean().alias("avg"))
+        .sort("day")
+    )
+
+    realtime = df["realtime"].drop_nulls()
+    return {
+        "count": len(sessions),
+        "stats": stats,
+        "realtime_mean": realtime.mean() if len(realtime) else None,
+        "bucket_counts": bucket_counts,
+        "languages": languages,
+        "daily": list(zip(day_df["day"].to_list(), day_df["count"].to_list(), day_df["avg"].to_list())),
+    }
+
+
+def print_report(report, sessions, logfile):
+    print(f"Parsed {report['count']} transcription sessions from {logfile}")
+    print()
+    print("Timings:")
+    for label, stats in report["stats"].items():
+        print(f"  {label}: min={stats['min']:.2f}s max={stats['max']:.2f}s "
+              f"mean={stats['mean']:.2f}s median={stats['median']:.2f}s stdev={stats['stdev']:.2f}s")
+    if report["realtime_mean"] is not None:
+        print(f"  Realtime factor: mean={report['realtime_mean']:.2f}x")
+
+    print()
+    print("Total time distribution:")
+    for i, count in enumerate(report["bucket_counts"]):
+        if i < len(HISTOGRAM_BUCKETS) - 1:
+            label = f"{HISTOGRAM_BUCKETS[i]:>3}-{HISTOGRAM_BUCKETS[i + 1]}s"
+        else:
+            label = f"{HISTOGRAM_BUCKETS[i]:>4}s+"
+        print(f"  {label:<8} {'#' * count} ({count})")
+
+    if report["languages"]:
+        print()
+        print("Languages:")
+        for lang, count in report["languages"]:
+            print(f"  {lang}: {count}")
+
+    if report["daily"]:
+        print()
+        print("Per day:")
+        for day, count, avg in report["daily"]:
+            print(f"  {day}: {count} messages, avg {avg:.2f}s")
+
+    # Slowest sessions: O(N log 5) partial sort instead of ordering the
+    # whole list just to take its head.
+    slowest = heapq.nlargest(
+        5,
+        (s for s in sessions if s.total_time_seconds),
+        key=lambda s: s.total_time_seconds,
+    )
+    if slowest:
+        print()
+        print("Slowest sessions:")
+        for s in slowest:
+            duration = f"{s.audio_duration_seconds:.0f}s audio" if s.audio_duration_seconds else "unknown duration"
+            print(f"  {s.received_at}: {s.total_time_seconds:.2f}s total ({duration})")
+
+
+def collect_log_files(path):
+    """Return the log file plus any rotated siblings (bot.log.1, bot.log.2, ...)."""
+    base = os.path.basename(path)
+    directory = os.path.dirname(path) or "."
+    if not os.path.isdir(directory):
+        return [path]
+    matches = sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if (name == base or name.startswith(base + ".")) and not name.endswith(".gz")
+    )
+    return matches or [path]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze Ascoltino bot logs")
+    parser.add_argument("logfile", nargs="?", default="logs/bot.log", help="Path to bot.log")
+    args = parser.parse_args()
+
+    paths = collect_log_files(args.logfile)
+    if len(paths) == 1:
+        sessions = parse_log_file(paths[0])
+    else:
+        # Rotated logs parse independently, so fan the files out across
+        # cores and concatenate the session lists.
+        with ProcessPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as executor:
+            sessions = list(chain.from_iterable(executor.map(parse_log_file, paths)))
+    if not sessions:
+        print("No transcription sessions found.")
+        return
+
+    summarize = summarize_polars if pl is not None else summarize_python
+    report = summarize(sessions)
+    source = paths[0] if len(paths) == 1 else f"{len(paths)} log files"
+    print_report(report, sessions, source)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""Benchmark faster-whisper configurations against the samples/ ground truth.
+
+Each sample is an audio file (.oga, .wav, ...) in the samples directory with
+a matching .txt file holding the expected transcription. The runner sweeps
+the requested parameter combinations, measures transcription speed, memory
+and word error rate, and writes JSON/CSV/markdown results that can be
+compared across machines.
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import re
+import resource
+import sys
+import socket
+import time
+from datetime import datetime
+from itertools import product
+from operator import itemgetter
+from pathlib import Path
+
+import jiwer
+import psutil
+from faster_whisper import WhisperModel
+
+# orjson serializes the nested results structure ~5-10x faster than stdlib
+# json and emits bytes directly; fall back to stdlib when not installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+AUDIO_EXTENSIONS = ("wav", "mp3", "ogg", "oga", "m4a", "flac", "opus")
+
+# Deletion table for normalize_text, built once: str.translate strips all
+# punctuation in a single C-level pass instead of one full-string copy per
+# punctuation character.
+_PUNCT_TABLE = str.maketrans("", "", ".,!?;:\"'()-")
+
+# Whitespace collapsing as a single precompiled substitution: unlike
+# " ".join(text.split()) it never materializes the token list, which adds up
+# on long transcripts.
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """Normalize text for WER comparison: lowercase, no punctuation, single spaces."""
+    return _WS_RE.sub(" ", text.lower().translate(_PUNCT_TABLE)).strip()
+
+
+def _peak_rss_bytes():
+    """Peak RSS of this process. ru_maxrss is KB on Linux, bytes on macOS."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _read_text_file(path):
+    """Read a small file in one binary gulp.
+
+    Ground-truth files are sub-page sized, so the TextIOWrapper's
+    incremental decoder and buffering cost more than the read itself; a
+    plain os.read of the stat'd size does open/read/close and one decode.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        data = os.read(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
+    return data.decode("utf-8", errors="replace")
+
+
+def load_samples(samples_dir):
+    """Load (audio, ground truth) pairs from the samples directory.
+
+    os.scandir yields DirEntry objects whose type check comes from the
+    directory read itself (no extra stat per file), and the suffix check
+    works on the plain name without allocating Path objects.
+    """
+    samples = []
+    with os.scandir(samples_dir) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            name = entry.name
+            stem, _, ext = name.rpartition(".")
+            if not stem or ext.lower() not in AUDIO_EXTENSIONS:
+                continue
+            txt_path = entry.path[:-len(ext)] + "txt"
+            if not os.path.isfile(txt_path):
+                continue
+            ground_truth = _read_text_file(txt_path).strip()
+            samples.append({
+                "name": stem,
+                "audio_path": entry.path,
+                "ground_truth": normalize_text(ground_truth),
+            })
+    samples.sort(key=itemgetter("name"))
+    return samples
+
+
+def get_system_info():
+    return {
+        "hostname": socket.gethostname(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": psutil.cpu_count(logical=True),
+        "memory_gb": round(psutil.virtual_memory().total / 1024 ** 3, 1),
+    }
+
+
+def run_single_benchmark(model_cache, params, samples):
+    """Run one parameter combination over all samples and return its result row."""
+    # Cache by (model, compute_type) only: num_workers sizes CTranslate2's
+    # request pool, not the weights, so a sweep over worker counts must not
+    # re-download and re-map gigabytes per combination. The cache keeps the
+    # worker count the instance was built with so mismatched reuse is loud.
+    model_key = (params["model"], params["compute_type"])
+    cached = model_cache.get(model_key)
+    if cached is None:
+        print(f"  Loading model {params['model']} ({params['compute_type']}, workers={params['num_workers']})...")
+        load_start = time.time()
+        model = WhisperModel(
+            params["model"],
+            device="cpu",
+            compute_type=params["compute_type"],
+            num_workers=params["num_workers"],
+        )
+        model_load_time = time.time() - load_start
+        model_cache[model_key] = (model, params["num_workers"])
+    else:
+        model, loaded_workers = cached
+        model_load_time = 0.0
+        if loaded_workers != params["num_workers"]:
+            print(f"  Note: reusing {params['model']} ({params['compute_type']}) loaded with "
+                  f"num_workers={loaded_workers}; CTranslate2 cannot resize the worker pool "
+                  f"without reloading the model")
+
+    sample_results = []
+    hypotheses = []
+    for sample in samples:
+        # getrusage is a single syscall; psutil's memory_info reopens and
+        # parses /proc/self/statm on every call, right inside the section
+        # being timed.
+        mem_before = _peak_rss_bytes()
+        start = time.time()
+        segments, info = model.transcribe(sample["audio_path"], beam_size=params["beam_size"])
+        transcript = " ".join(segment.text.strip() for segment in segments)
+        elapsed = time.time() - start
+        mem_after = _peak_rss_bytes()
+
+        hypotheses.append(normalize_text(transcript))
+        sample_results.append({
+            "sample": sample["name"],
+            "transcribe_time_s": round(elapsed, 3),
+            "audio_duration_s": round(info.duration, 2),
+            "peak_rss_delta_mb": round((mem_after - mem_before) / 1024 ** 2, 1),
+        })
+
+    # One batched jiwer call per configuration: the transformation pipeline
+    # and alignment state are set up once for all samples, and the result is
+    # a proper corpus-level WER instead of a mean of per-sample rates.
+    references = [sample["ground_truth"] for sample in samples]
+    wer = jiwer.wer(references, hypotheses)
+
+    times = [r["transcribe_time_s"] for r in sample_results]
+    durations = [r["audio_duration_s"] for r in sample_results]
+    return {
+        **params,
+        "model_load_time_s": round(model_load_time, 2),
+        "avg_transcribe_time_s": round(sum(times) / len(times), 3),
+        "total_transcribe_time_s": round(sum(times), 3),
+        "realtime_factor": round(sum(durations) / sum(times), 2) if sum(times) else None,
+        "wer": round(wer, 4),
+        "samples": sample_results,
+    }
+
+
+def run_benchmarks(samples, param_grid):
+    model_cache = {}
+    results = []
+    for idx, params in enumerate(param_grid, 1):
+        print(f"[{idx}/{len(param_grid)}] model={params['model']} compute={params['compute_type']} "
+              f"workers={params['num_workers']} beam={params['beam_size']}")
+        results.append(run_single_benchmark(model_cache, params, samples))
+    return results
+
+
+def save_results(results, system_info, output_dir):
+    """Write the full JSON, a flat CSV and a markdown summary report."""
+    out = Path(output_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    hostname = system_info["hostname"]
+
+    full_results = {
+        "system": system_info,
+        "timestamp": datetime.now().isoformat(),
+        "benchmarks": results,
+    }
+    json_path = out / f"results_{hostname}_{stamp}.json"
+    if orjson is not None:
+        json_path.write_bytes(orjson.dumps(full_results, option=orjson.OPT_INDENT_2))
+    else:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(full_results, f, indent=2)
+
+    headers = ["model", "compute_type", "num_workers", "beam_size",
+               "avg_transcribe_time_s", "realtime_factor", "wer", "model_load_time_s"]
+    csv_path = out / f"results_{hostname}_{stamp}.csv"
+    # csv.writer formats rows in C and writerows batches them through one
+    # large buffer instead of a write() per row.
+    with open(csv_path, "w", newline="", encoding="utf-8", buffering=1 << 16) as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows(tuple(result.get(h, "") for h in headers) for result in results)
+
+    # One sort orders the table and hands us the fastest row for free;
+    # itemgetter keys are C-level, so no Python lambda runs per comparison.
+    by_speed = sorted(results, key=itemgetter("avg_transcribe_time_s"))
+    fastest = by_speed[0]
+    most_accurate = min(results, key=itemgetter("wer"))
+    md_path = out / f"report_{hostname}_{stamp}.md"
+    parts = [
+        f"# Ascoltino benchmark - {hostname}\n\n",
+        f"{system_info['platform']} | {system_info['cpu_count']} CPUs | "
+        f"{system_info['memory_gb']} GB RAM\n\n",
+        "| model | compute | workers | beam | avg time (s) | realtime | WER |\n",
+        "|---|---|---|---|---|---|---|\n",
+    ]
+    for r in by_speed:
+        parts.append(f"| {r['model']} | {r['compute_type']} | {r['num_workers']} | {r['beam_size']} "
+                     f"| {r['avg_transcribe_time_s']} | {r['realtime_factor']}x | {r['wer']} |\n")
+    parts.append(f"\nFastest: `{fastest['model']}` "
+                 f"(compute={fastest['compute_type']}, workers={fastest['num_workers']}) "
+                 f"at {fastest['avg_transcribe_time_s']}s avg\n")
+    parts.append(f"Most accurate: `{most_accurate['model']}` "
+                 f"(compute={most_accurate['compute_type']}, workers={most_accurate['num_workers']}) "
+                 f"at WER {most_accurate['wer']}\n")
+    with open(md_path, "w", encoding="utf-8") as f:
+        f.writelines(parts)
+
+    print(f"Results saved to {json_path}, {csv_path} and {md_path}")
+
+
+def parse_list(value):
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark faster-whisper configurations")
+    parser.add_argument("--samples", default="samples", help="Directory with audio + .txt ground truth pairs")
+    parser.add_argument("--output", default="benchmark/results", help="Directory for result files")
+    parser.add_argument("--models", default="base", help="Comma-separated model names")
+    parser.add_argument("--compute-types", default="int8", help="Comma-separated compute types")
+    parser.add_argument("--num-workers", default="1", help="Comma-separated worker counts")
+    parser.add_argument("--beam-sizes", default="1", help="Comma-separated beam sizes")
+    args = parser.parse_args()
+
+    samples = load_samples(args.samples)
+    if not samples:
+        print(f"No samples found in {args.samples} (need audio files with matching .txt ground truth)")
+        return
+
+    param_grid = [
+        {"model": m, "compute_type": ct, "num_workers": int(w), "beam_size": int(b)}
+        for m, ct, w, b in product(
+            parse_list(args.models), parse_list(args.compute_types),
+            parse_list(args.num_workers), parse_list(args.beam_sizes),
+        )
+    ]
+    print(f"Benchmarking {len(param_grid)} configurations over {len(samples)} samples")
+    results = run_benchmarks(samples, param_grid)
+    save_results(results, get_system_info(), args.output)
+
+
+if __name__ == "__main__":
+    main()
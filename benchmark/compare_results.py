@@ -0,0 +1,196 @@
+"""Compare benchmark results across machines.
+
+Reads the JSON files written by benchmark_runner.py and prints a
+per-configuration comparison table, threading-efficiency ratios and an
+overall recommendation. Configurations are keyed by (model, num_workers).
+"""
+import argparse
+import glob
+import json
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# orjson parses result files ~5x faster than stdlib json; fall back cleanly
+# where it isn't installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ijson streams the benchmarks array entry by entry, so aggregating many
+# machines never holds more than one benchmark row of a file in memory.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+def load_results(filepath):
+    """Load one results JSON file."""
+    with open(filepath, "rb") as f:
+        data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _bench_entry(bench):
+    """Normalize one benchmark row to the fields the comparison uses."""
+    time_s = bench.get("avg_transcribe_time_s")
+    wer = bench.get("wer")
+    realtime = bench.get("realtime_factor")
+    return {
+        "time": float(time_s) if time_s is not None else None,
+        "wer": float(wer) if wer is not None else None,
+        "realtime": float(realtime) if realtime is not None else None,
+    }
+
+
+def _parse_file(filepath):
+    """Parse one result file into (filepath, system, benchmarks)."""
+    benchmarks = {}
+    if ijson is not None:
+        # Stream the file: pull out the system object, then fold each
+        # benchmarks entry into the dict as it is parsed instead of
+        # materializing the whole result document.
+        with open(filepath, "rb") as f:
+            system = next(ijson.items(f, "system"), {})
+            f.seek(0)
+            for bench in ijson.items(f, "benchmarks.item"):
+                benchmarks[(bench.get("model"), bench.get("num_workers"))] = _bench_entry(bench)
+    else:
+        data = load_results(filepath)
+        system = data.get("system", {})
+        for bench in data.get("benchmarks", []):
+            benchmarks[(bench.get("model"), bench.get("num_workers"))] = _bench_entry(bench)
+    return filepath, system, benchmarks
+
+
+def compare_machines(files):
+    """Parse result files into two views of the same benchmark entries.
+
+    Returns (machines, per_config): machines maps hostname -> system info
+    and benchmarks, while per_config inverts that to
+    {(model, num_workers): {hostname: bench}} so the comparison table can
+    look rows up directly instead of re-scanning every machine per config.
+    """
+    # Files are independent read+parse jobs, so a small thread pool overlaps
+    # their I/O; ex.map keeps results in argument order and the dicts are
+    # folded on the main thread, so machine ordering stays deterministic.
+    if len(files) > 1:
+        with ThreadPoolExecutor(max_workers=min(8, len(files))) as ex:
+            parsed = list(ex.map(_parse_file, files))
+    else:
+        parsed = [_parse_file(filepath) for filepath in files]
+
+    machines = {}
+    per_config = defaultdict(dict)
+    for filepath, system, benchmarks in parsed:
+        hostname = system.get("hostname", filepath)
+        machines[hostname] = {"system": system, "benchmarks": benchmarks}
+        for config, bench in benchmarks.items():
+            per_config[config][hostname] = bench
+    return machines, per_config
+
+
+# Bound-method format callables for the hot table cells: the format spec is
+# parsed once here instead of once per (config, machine) cell, and the N/A
+# cell is a constant.
+_fmt_time = "{:>12.3f}".format
+_fmt_name = "{:>12}".format
+_fmt_na = f"{'N/A':>12}"
+
+
+def _times_matrix(machine_names, sorted_configs, per_config):
+    """Structure-of-arrays view of the table: one float per (machine, config).
+
+    NaN marks a config the machine didn't run, so the comparison math below
+    is vectorized nanmin/argmin/ratios instead of per-cell Python loops.
+    """
+    times = np.full((len(machine_names), len(sorted_configs)), np.nan)
+    for j, config in enumerate(sorted_configs):
+        row = per_config[config]
+        for i, name in enumerate(machine_names):
+            bench = row.get(name)
+            if bench and bench["time"] is not None:
+                times[i, j] = bench["time"]
+    return times
+
+
+def print_comparison(machines, per_config):
+    sorted_configs = sorted(per_config)
+    machine_names = list(machines)
+    times = _times_matrix(machine_names, sorted_configs, per_config)
+
+    # Column-wise winner/speedup math in one shot; NaN-as-inf keeps argmin
+    # well-defined on configs some machines skipped.
+    filled = np.where(np.isnan(times), np.inf, times)
+    winner_idx = filled.argmin(axis=0)
+    col_min = filled.min(axis=0)
+    col_max = np.where(np.isnan(times), -np.inf, times).max(axis=0)
+    col_has = np.isfinite(col_min)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        speedups = (col_max - col_min) / col_max * 100
+
+    # Rows accumulate as lists of cells with one join per line; repeated
+    # str += would re-copy the growing row once per machine column.
+    header_cells = [f"{'config':<18}"]
+    for name in machine_names:
+        header_cells.append(_fmt_name(name))
+    header_cells.append(f"{'winner':>16}")
+    header = " | ".join(header_cells)
+    print(header)
+    print("-" * len(header))
+
+    for j, config in enumerate(sorted_configs):
+        cells = [f"{str(config[0]):<8} w={config[1]}".ljust(18)]
+        for i in range(len(machine_names)):
+            cell = times[i, j]
+            cells.append(_fmt_na if np.isnan(cell) else _fmt_time(cell))
+        if col_has[j]:
+            speedup = speedups[j] if col_max[j] > 0 else 0.0
+            cells.append(f"{machine_names[winner_idx[j]]:>11} -{speedup:.0f}%")
+        print(" | ".join(cells))
+
+    # Threading efficiency: gather each config's workers=1 baseline column,
+    # then one vectorized divide gives every ratio for a machine's row.
+    config_index = {config: j for j, config in enumerate(sorted_configs)}
+    baseline_idx = np.array(
+        [config_index.get((model, 1), -1) for model, _ in sorted_configs])
+    multi_worker = [j for j, (_, workers) in enumerate(sorted_configs) if workers != 1]
+    print()
+    print("Threading efficiency (speedup vs workers=1):")
+    for i, name in enumerate(machine_names):
+        row = times[i]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            base = np.where(baseline_idx >= 0, row[baseline_idx], np.nan)
+            ratios = base / row
+        for j in multi_worker:
+            if np.isfinite(ratios[j]) and ratios[j] > 0:
+                model, workers = sorted_configs[j]
+                print(f"  {name}: {model} w={workers}: {ratios[j]:.2f}x")
+
+    if np.isfinite(filled).any():
+        i, j = np.unravel_index(filled.argmin(), filled.shape)
+        model, workers = sorted_configs[j]
+        print()
+        print(f"Fastest overall: {model} w={workers} on {machine_names[i]} ({times[i, j]:.3f}s avg)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare benchmark results across machines")
+    parser.add_argument("results", nargs="*",
+                        help="Result JSON files (default: benchmark/results/results_*.json)")
+    args = parser.parse_args()
+
+    files = args.results or sorted(glob.glob("benchmark/results/results_*.json"))
+    if not files:
+        print("No result files found.")
+        return
+
+    machines, per_config = compare_machines(files)
+    print_comparison(machines, per_config)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,60 @@
+import atexit
 import os
+import queue
+import signal
+import sys
+import threading
 import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import requests
 import subprocess
+from functools import lru_cache
 from itertools import product
+
+# OpenMP pinning must be in the environment before CTranslate2 (pulled in by
+# faster-whisper) initializes its thread pool; set afterwards it is ignored.
+# Keeping workers on fixed physical cores preserves L2/L3 locality for the
+# int8 GEMMs that dominate transcription time. setdefault everywhere, so a
+# deployment can still override any of these. The parse helpers below don't
+# exist yet at this point, so the sweep shape comes from the raw env values.
+_THREADS_VALUES = [int(t.strip()) for t in os.getenv("THREADS", "4").split(",") if t.strip()]
+_PRIMARY_THREADS = _THREADS_VALUES[0] if _THREADS_VALUES else 0
+_N_CONFIGS = (
+    max(1, len([v for v in os.getenv("BOT_MODEL", "base").split(",") if v.strip()]))
+    * max(1, len([v for v in os.getenv("BEAM_SIZE", "1").split(",") if v.strip()]))
+    * max(1, len([v for v in os.getenv("VAD_FILTER", "true").split(",") if v.strip()]))
+    * max(1, len(_THREADS_VALUES))
+)
+if _PRIMARY_THREADS > 0:
+    os.environ.setdefault("OMP_NUM_THREADS", str(_PRIMARY_THREADS))
+os.environ.setdefault("OMP_PROC_BIND", "close")
+os.environ.setdefault("OMP_PLACES", "cores")
+# Only read by Intel's OpenMP runtime; harmless elsewhere
+os.environ.setdefault("KMP_AFFINITY", "granularity=fine,compact,1,0")
+# Size the mask for the whole sweep, not just the primary config: a
+# multi-config sweep runs configs in parallel, each on its own thread
+# count, so pinning to THREADS_LIST[0] cores would force it serial.
+# THREADS=0 means "all cores" to CT2, so any 0 in the list skips the pin.
+if _THREADS_VALUES and 0 not in _THREADS_VALUES and hasattr(os, "sched_setaffinity"):
+    _PIN_CORES = min(os.cpu_count() or 1, max(_THREADS_VALUES) * _N_CONFIGS)
+    try:
+        os.sched_setaffinity(0, set(range(_PIN_CORES)))
+    except OSError:
+        pass
+
 from faster_whisper import WhisperModel
 
+# orjson decodes the getUpdates payload noticeably faster than stdlib json
+# on bulk update batches; fall back cleanly where it isn't installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 import logging
+import logging.handlers
 
 VERSION = "1.2.1"
 
@@ -30,24 +79,55 @@ os.makedirs(LOG_DIR, exist_ok=True)
 
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 API_URL = f"https://api.telegram.org/bot{BOT_TOKEN}"
+
+# One pooled HTTPS session for every Telegram call: the TCP+TLS handshake is
+# paid once and the connection stays warm across the long-poll loop and the
+# streaming edits. The pool holds a few connections so a streaming edit and
+# a file download can overlap the long poll without evicting each other.
+SESSION = requests.Session()
+SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8))
 BOT_NAME = os.getenv("BOT_NAME", "")
 LANGUAGE = os.getenv("LANGUAGE")
 ADMIN_CHAT_ID = os.getenv("ADMIN_CHAT_ID")  # Optional: send startup message to this chat
 SHOW_FOOTER = os.getenv("SHOW_FOOTER", "true").lower() == "true"
+# CTranslate2 quantization/kernel selection. "auto" lets CT2 pick the best
+# kernel for the host: VNNI/AMX int8 where those instructions exist, FP32 on
+# older CPUs where the int8 GEMM path actually regresses.
+COMPUTE_TYPE = os.getenv("COMPUTE_TYPE", "auto")
+
+def _cpu_accel_flags():
+    """Report which int8-relevant instruction sets this CPU advertises."""
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = set()
+            for line in f:
+                if line.startswith("flags"):
+                    flags = set(line.split(":", 1)[1].split())
+                    break
+    except OSError:
+        return []
+    return [flag for flag in ("avx2", "avx512_vnni", "avx_vnni", "amx_int8") if flag in flags]
 
-# Parse comma-separated config values for multi-config mode
+# Parse comma-separated config values for multi-config mode. Results are
+# frozen tuples; model names are interned so cache keys built from them
+# hash and compare by identity.
 def parse_models(val):
-    return [m.strip() for m in val.split(",") if m.strip()]
+    return tuple(sys.intern(m.strip()) for m in val.split(",") if m.strip())
 
 def parse_ints(val):
-    return [int(x.strip()) for x in val.split(",") if x.strip()]
+    return tuple(int(x.strip()) for x in val.split(",") if x.strip())
 
 def parse_bools(val):
-    return [x.strip().lower() == "true" for x in val.split(",") if x.strip()]
+    return tuple(x.strip().lower() == "true" for x in val.split(",") if x.strip())
 
 BOT_MODELS = parse_models(os.getenv("BOT_MODEL", "base"))
 BEAM_SIZES = parse_ints(os.getenv("BEAM_SIZE", "1"))
-VAD_FILTERS = parse_bools(os.getenv("VAD_FILTER", "false"))
+# VAD defaults on: Telegram voice notes routinely open and close with
+# silence, and skipping those frames is nearly free accuracy-wise
+VAD_FILTERS = parse_bools(os.getenv("VAD_FILTER", "true"))
+# Speech-probability cutoff for the VAD; raise it to trim more aggressively
+# in noisy rooms, lower it if quiet speakers get clipped
+VAD_THRESHOLD = float(os.getenv("VAD_THRESHOLD", "0.5"))
 THREADS_LIST = parse_ints(os.getenv("THREADS", "4"))
 
 # For backward compatibility, expose single values (first in list)
@@ -57,17 +137,38 @@ VAD_FILTER = VAD_FILTERS[0]
 THREADS = THREADS_LIST[0]
 
 # Check if we're in multi-config mode (more than one combination)
-CONFIGS = list(product(BOT_MODELS, BEAM_SIZES, VAD_FILTERS, THREADS_LIST))
+CONFIGS = tuple(product(BOT_MODELS, BEAM_SIZES, VAD_FILTERS, THREADS_LIST))
 MULTI_CONFIG_MODE = len(CONFIGS) > 1
 
+# Each combination becomes one immutable config object built once at
+# startup, so transcribe takes a ready config instead of re-filling four
+# keyword defaults on every call.
+TranscribeConfig = namedtuple("TranscribeConfig", ["model_name", "beam_size", "vad_filter", "threads"])
+CONFIG_OBJS = tuple(TranscribeConfig(*config) for config in CONFIGS)
+PRIMARY_CONFIG = CONFIG_OBJS[0]
+
 LAST_UPDATE_FILE = os.path.join(DATA_DIR, ".last_update")
-VOICE_FILE_PATH = os.path.join(DATA_DIR, "voice.oga")
 
+MIN_EDIT_INTERVAL = 0.5  # 500ms floor between streaming message edits
+OFFSET_FLUSH_INTERVAL = 5.0  # seconds between .last_update disk writes
+POLL_ERROR_BACKOFF = 3.0  # seconds to back off when getUpdates fails
+
+# Records are formatted and written on a background listener thread: the
+# decode loop only enqueues, so a slow disk never stalls segment emission.
+_log_queue = queue.SimpleQueue()
+_log_file_handler = logging.FileHandler(LOG_FILE)
+_log_file_handler.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(message)s'))
+# The queue handler keeps a bare formatter: it bakes only the message text
+# into the record, leaving the timestamp/level layout to the file handler
+_log_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_log_queue_handler.setFormatter(logging.Formatter('%(message)s'))
 logging.basicConfig(
-    filename=LOG_FILE,
     level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
+    handlers=[_log_queue_handler],
 )
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_file_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 log = logging.getLogger(__name__)
 
@@ -91,20 +192,63 @@ if MULTI_CONFIG_MODE:
 else:
     log.info(f"Config: model={BOT_MODEL}, beam={BEAM_SIZE}, vad={VAD_FILTER}, threads={THREADS}, name={BOT_NAME or '(not set)'}")
 
-# Load all unique models (keyed by model name and threads since threads affects model loading)
-models = {}
-for model_name in BOT_MODELS:
-    for threads in THREADS_LIST:
-        key = (model_name, threads)
-        if key not in models:
-            log.info(f"Loading Whisper model: {model_name} (threads={threads})")
-            print(f"  Loading model {model_name} (threads={threads})...")
-            models[key] = WhisperModel(model_name, device="cpu", compute_type="int8", cpu_threads=threads)
-            log.info(f"Model {model_name} loaded!")
+# Log the quantization path next to the hardware so ops can correlate
+# transcription speed with what the CPU actually supports
+_accel = _cpu_accel_flags()
+log.info(f"Compute type: {COMPUTE_TYPE} (CPU flags: {', '.join(_accel) if _accel else 'none detected'})")
+
+# Model loading is memoized per model name only: the weights are identical
+# across thread counts, and a second copy of the same model costs hundreds
+# of MB to GBs of RAM for zero kernel benefit. Every config shares one
+# instance pinned to the primary THREADS value.
+@lru_cache(maxsize=None)
+def get_model(model_name):
+    log.info(f"Loading Whisper model: {model_name} (threads={THREADS})")
+    print(f"  Loading model {model_name} (threads={THREADS})...")
+    loaded = WhisperModel(model_name, device="cpu", compute_type=COMPUTE_TYPE,
+                          cpu_threads=THREADS, num_workers=1)
+    log.info(f"Model {model_name} loaded!")
+    return loaded
+
+if len(set(THREADS_LIST)) > 1:
+    log.warning(f"THREADS={THREADS_LIST}: models are shared across configs and "
+                f"pinned to threads={THREADS}; a thread sweep no longer reloads weights")
+
+
+# Models load in the background so the long-poll loop starts immediately;
+# a voice note arriving during warmup just waits on the event inside
+# transcribe instead of the whole process blocking on import.
+_models_ready = threading.Event()
+
+def _load_models():
+    """Warm the cache for every configured model.
+
+    A dummy transcribe over one second of silence follows each load: it
+    forces kernel/ISA dispatch, tokenizer load and first-touch page faults
+    over the weights, so the first real voice note hits hot paths.
+    """
+    warmup_audio = np.zeros(16000, dtype=np.float32)
+    try:
+        for model_name in BOT_MODELS:
+            model = get_model(model_name)
+            warmup_start = time.time()
+            try:
+                segments, _ = model.transcribe(warmup_audio, language=LANGUAGE or "en", beam_size=1)
+                list(segments)
+                log.info(f"Model {model_name} warmed up in {time.time() - warmup_start:.2f}s")
+            except Exception as e:
+                log.warning(f"Warmup transcribe failed for {model_name}: {e}")
+        print(f"  ✅ Ready!")
+    except Exception as e:
+        # Bad model name or no network on a fresh deploy: don't leave
+        # transcribe blocked on the event forever. Each message's own
+        # get_model call will retry the load and surface the error.
+        log.error(f"Model preload failed: {e}")
+        print(f"  ⚠️ Model preload failed: {e}")
+    finally:
+        _models_ready.set()
 
-# For backward compatibility
-model = models[(BOT_MODEL, THREADS)]
-print(f"  ✅ Ready!")
+threading.Thread(target=_load_models, daemon=True).start()
 
 
 def send_startup_message():
@@ -114,7 +258,7 @@ def send_startup_message():
     try:
         footer = format_config_footer()
         text = f"✅ Ascoltino is ready!{footer}"
-        requests.post(f"{API_URL}/sendMessage", data={
+        SESSION.post(f"{API_URL}/sendMessage", data={
             "chat_id": ADMIN_CHAT_ID,
             "text": text,
             "disable_notification": True
@@ -123,107 +267,179 @@ def send_startup_message():
     except Exception as e:
         log.warning(f"Failed to send startup message: {e}")
 
-def convert_oga_to_wav(input_path, output_path):
+def get_last_update_id():
+    # No exists pre-check: a missing or torn file both mean "start from 0"
     try:
-        log.info(f"Converting {input_path} to WAV format")
-        result = subprocess.run(
-            ["ffmpeg", "-y", "-i", input_path, "-ar", "16000", "-ac", "1", "-c:a", "pcm_s16le", output_path],
-            capture_output=True,
-            text=True
-        )
-        if result.returncode != 0:
-            log.error(f"FFmpeg error: {result.stderr}")
-            return False
-        return True
-    except Exception as e:
-        log.error(f"FFmpeg conversion failed: {e}")
-        return False
+        with open(LAST_UPDATE_FILE) as f:
+            return int(f.read().strip())
+    except (FileNotFoundError, ValueError):
+        return 0
 
-def get_last_update_id():
-    if not os.path.exists(LAST_UPDATE_FILE):
-        with open(LAST_UPDATE_FILE, "w") as f:
-            f.write("0")
-    with open(LAST_UPDATE_FILE, "r") as f:
-        return int(f.read().strip())
 
+_last_flush = 0.0
+
+def set_last_update_id(update_id, force=False):
+    """Persist the offset, rate-limited to one disk write per flush interval.
+
+    Bursts of voice messages then cost a single write; shutdown paths pass
+    force=True so the final offset always lands on disk. Flushes are rare
+    enough to afford a tmp-file + rename, so a crash mid-write leaves the
+    previous offset intact instead of a truncated file.
+    """
+    global _last_flush
+    now = time.monotonic()
+    if not force and now - _last_flush < OFFSET_FLUSH_INTERVAL:
+        return
+    _last_flush = now
+    tmp_file = LAST_UPDATE_FILE + ".tmp"
+    with open(tmp_file, "w") as f:
+        f.write(f"{update_id}\n")
+    os.replace(tmp_file, LAST_UPDATE_FILE)
 
 
-def set_last_update_id(update_id):
-    with open(LAST_UPDATE_FILE, "w") as f:
-        f.write(str(update_id))
+def _parse_json(res):
+    """Decode a Telegram API response body."""
+    return orjson.loads(res.content) if orjson is not None else res.json()
 
 
 def get_updates(offset=None):
-    params = {"timeout": 30}
+    # Long-poll window of 50s: Telegram holds the connection open, so idle
+    # wakeups (and their HTTP round-trips) drop to ~1 per minute. The client
+    # timeout stays a bit above so the server side always expires first.
+    params = {"timeout": 50}
     if offset:
         params["offset"] = offset
     try:
-        res = requests.get(f"{API_URL}/getUpdates", params=params, timeout=35)
-        return res.json()["result"]
+        res = SESSION.get(f"{API_URL}/getUpdates", params=params, timeout=55)
+        return _parse_json(res)["result"]
     except Exception as e:
-        log.info(f"Error getting updates: {e}")
+        # Fast failures (DNS errors, refused connections, a bad token's
+        # ok:false response) would otherwise spin the no-sleep poll loop at
+        # full tilt; back off briefly before the next attempt.
+        log.info("Error getting updates: %s", e)
+        time.sleep(POLL_ERROR_BACKOFF)
         return []
 
 
-def download_file(file_id):
+def download_and_decode(file_id):
+    """Stream a voice file through ffmpeg into 16 kHz float32 samples.
+
+    The HTTP body is fed into ffmpeg's stdin from a helper thread while the
+    decoded PCM is read from stdout here, so download and decode overlap
+    and the compressed audio is never held whole, let alone written to disk.
+    """
     try:
         log.info("Downloading file")
-        res = requests.get(f"{API_URL}/getFile", params={"file_id": file_id})
-        file_path = res.json()["result"]["file_path"]
+        res = SESSION.get(f"{API_URL}/getFile", params={"file_id": file_id})
+        file_path = _parse_json(res)["result"]["file_path"]
         download_url = f"https://api.telegram.org/file/bot{BOT_TOKEN}/{file_path}"
-        local_path = VOICE_FILE_PATH
-        with requests.get(download_url, stream=True) as r:
-            with open(local_path, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
+
+        log.info("Converting voice message to 16 kHz mono PCM")
+        proc = subprocess.Popen(
+            ["ffmpeg", "-loglevel", "error", "-i", "pipe:0",
+             "-f", "f32le", "-ar", "16000", "-ac", "1", "pipe:1"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+
+        # A dropped connection mid-download would otherwise just close
+        # ffmpeg's stdin and decode the truncated clip cleanly; the feeder
+        # records its failure so the whole message errors instead.
+        feed_error = []
+
+        def feed():
+            try:
+                with SESSION.get(download_url, stream=True) as r:
+                    for chunk in r.iter_content(chunk_size=65536):
+                        proc.stdin.write(chunk)
+            except Exception as e:
+                log.error(f"Download failed: {e}")
+                feed_error.append(e)
+            finally:
+                try:
+                    proc.stdin.close()
+                except OSError:
+                    pass
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+        pcm = proc.stdout.read()
+        feeder.join()
+        stderr = proc.stderr.read()
+        if proc.wait() != 0:
+            log.error(f"FFmpeg error: {stderr.decode(errors='replace')}")
+            return None
+        if feed_error:
+            return None
         log.info("File downloaded!")
-        return local_path
+        return np.frombuffer(pcm, dtype=np.float32)
     except Exception as e:
-        log.error(f"Download failed: {e}")
+        log.error(f"FFmpeg conversion failed: {e}")
         return None
 
-def transcribe(file_path, on_segment=None, model_name=None, beam_size=None, vad_filter=None, threads=None):
+# Language detected on the first message when LANGUAGE is unset. Detection
+# costs a full encoder forward pass per clip, and a chat's language rarely
+# changes between voice notes, so the first result is reused afterwards.
+_detected_language = None
+
+
+def transcribe(audio, cfg=PRIMARY_CONFIG, on_segment=None):
     """
-    Transcribe audio file. If on_segment callback is provided,
-    it will be called with the accumulated text after each segment.
-    
-    Config parameters default to the primary config if not specified.
-    
+    Transcribe decoded audio samples with the given config. If on_segment
+    callback is provided, it will be called with the accumulated text after
+    each segment.
+
     Returns a dict with 'text', 'duration', 'elapsed', and config info on success, or None on failure.
     """
-    # Use defaults if not specified
-    model_name = model_name if model_name is not None else BOT_MODEL
-    beam_size = beam_size if beam_size is not None else BEAM_SIZE
-    vad_filter = vad_filter if vad_filter is not None else VAD_FILTER
-    threads = threads if threads is not None else THREADS
-    
+    global _detected_language
+
     try:
-        log.info(f"Transcribing file (model={model_name}, beam={beam_size}, vad={vad_filter}, threads={threads})")
+        # %-style args defer formatting to the logging module, so these
+        # per-message (and per-segment) records cost nothing when the level
+        # is raised above INFO in production
+        log.info("Transcribing file (model=%s, beam=%s, vad=%s, threads=%s)",
+                 cfg.model_name, cfg.beam_size, cfg.vad_filter, cfg.threads)
         start_time = time.time()
+
+        # Wait for the background warmup, then grab the cached model
+        _models_ready.wait()
+        current_model = get_model(cfg.model_name)
         
-        # Get the appropriate model
-        current_model = models[(model_name, threads)]
-        
+        # Voice notes are short, independent clips: cross-segment
+        # conditioning and timestamp tokens buy nothing interactive users
+        # see, so both are off to shrink the per-step decode work.
         segments, info = current_model.transcribe(
-            file_path,
-            language=LANGUAGE,
-            beam_size=beam_size,
-            vad_filter=vad_filter,
+            audio,
+            language=LANGUAGE or _detected_language,
+            beam_size=cfg.beam_size,
+            vad_filter=cfg.vad_filter,
+            vad_parameters=dict(min_silence_duration_ms=500, threshold=VAD_THRESHOLD),
+            condition_on_previous_text=False,
+            without_timestamps=True,
         )
-        log.info(f"Detected language '{info.language}' with probability {info.language_probability:.2f}")
+        log.info("Detected language '%s' with probability %.2f",
+                 info.language, info.language_probability)
+        if LANGUAGE is None and _detected_language is None:
+            _detected_language = info.language
         
-        full_text = ""
+        # Segments collect into a list joined once at the end; repeated
+        # string += would re-copy the growing text on every segment
+        parts = []
         for segment in segments:
-            log.info(f"[{segment.start:.2f}s -> {segment.end:.2f}s] {segment.text}")
-            full_text += segment.text.strip() + " "
-            
+            # DEBUG so production INFO logs skip the per-segment records;
+            # the isEnabledFor guard also skips the enqueue itself
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("[%.2fs -> %.2fs] %s", segment.start, segment.end, segment.text)
+            text = segment.text.strip()
+            if text:
+                parts.append(text)
+
             # Call the callback with accumulated text if provided
             if on_segment:
-                on_segment(full_text.strip())
+                on_segment(" ".join(parts))
 
         elapsed = time.time() - start_time
-        full_text = full_text.strip()
-        
+        full_text = " ".join(parts)
+
         if not full_text:
             log.warning("No transcription result found.")
             return None
@@ -232,10 +448,10 @@ def transcribe(file_path, on_segment=None, model_name=None, beam_size=None, vad_
             "text": full_text,
             "duration": info.duration,
             "elapsed": elapsed,
-            "model": model_name,
-            "beam_size": beam_size,
-            "vad_filter": vad_filter,
-            "threads": threads,
+            "model": cfg.model_name,
+            "beam_size": cfg.beam_size,
+            "vad_filter": cfg.vad_filter,
+            "threads": cfg.threads,
         }
 
     except Exception as e:
@@ -256,21 +472,15 @@ def format_config_footer():
     return "\n\n---\n" + " | ".join(parts)
 
 
-def format_stats_footer(duration, elapsed, model_name=None, beam_size=None, vad_filter=None, threads=None):
+def format_stats_footer(duration, elapsed, cfg=PRIMARY_CONFIG):
     """Format a stats footer with transcription info."""
-    # Use defaults if not specified
-    model_name = model_name if model_name is not None else BOT_MODEL
-    beam_size = beam_size if beam_size is not None else BEAM_SIZE
-    vad_filter = vad_filter if vad_filter is not None else VAD_FILTER
-    threads = threads if threads is not None else THREADS
-    
     speed = duration / elapsed if elapsed > 0 else 0
     parts = [
         f"⏱ {elapsed:.1f}s ({speed:.1f}x)",
-        f"model={model_name}",
-        f"beam={beam_size}",
-        f"vad={'on' if vad_filter else 'off'}",
-        f"threads={threads}",
+        f"model={cfg.model_name}",
+        f"beam={cfg.beam_size}",
+        f"vad={'on' if cfg.vad_filter else 'off'}",
+        f"threads={cfg.threads}",
         f"v{VERSION}",
     ]
     if BOT_NAME:
@@ -281,7 +491,7 @@ def format_stats_footer(duration, elapsed, model_name=None, beam_size=None, vad_
 def send_message(chat_id, text):
     try:
         log.info("Sending message")
-        requests.post(f"{API_URL}/sendMessage", data={"chat_id": chat_id, "text": text, "disable_notification": True})
+        SESSION.post(f"{API_URL}/sendMessage", data={"chat_id": chat_id, "text": text, "disable_notification": True})
     except Exception as e:
         log.error(f"Failed to send message: {e}")
 
@@ -289,7 +499,7 @@ def send_message(chat_id, text):
 def send_message_and_get_id(chat_id, text):
     """Send message and return message_id for later editing."""
     try:
-        res = requests.post(f"{API_URL}/sendMessage", data={
+        res = SESSION.post(f"{API_URL}/sendMessage", data={
             "chat_id": chat_id,
             "text": text,
             "disable_notification": True
@@ -303,24 +513,142 @@ def send_message_and_get_id(chat_id, text):
 def edit_message(chat_id, message_id, text):
     """Edit an existing message."""
     try:
-        requests.post(f"{API_URL}/editMessageText", data={
+        # No link previews: transcripts occasionally contain URLs and the
+        # preview fetch adds Telegram-side latency to every streaming edit
+        SESSION.post(f"{API_URL}/editMessageText", data={
             "chat_id": chat_id,
             "message_id": message_id,
-            "text": text
+            "text": text,
+            "disable_web_page_preview": True
         })
     except Exception as e:
         log.warning(f"Failed to edit message: {e}")
 
 
-def cleanup_temp_files(*file_paths):
-    """Remove temporary files after processing."""
-    for file_path in file_paths:
+# Transcription runs on a single worker thread: CTranslate2 releases the
+# GIL during decode, so the long poll keeps collecting updates while a clip
+# is being transcribed. One worker keeps replies in arrival order and the
+# model uncontended.
+TRANSCRIBE_EXECUTOR = ThreadPoolExecutor(max_workers=1)
+
+
+def _process_multi_config(chat_id, audio):
+    """Transcribe with every configured combination and send one reply each.
+
+    Configs run concurrently when the host has spare cores: CTranslate2
+    releases the GIL during decode, so the sweep finishes in roughly the
+    slowest config's time instead of the sum. The worker count keeps
+    workers x threads within the core budget to avoid OMP oversubscription,
+    and replies go out in config order once every result is in.
+    """
+    log.info("Multi-config mode: processing %d configurations", len(CONFIG_OBJS))
+    send_message(chat_id, f"🎤 Processing with {len(CONFIG_OBJS)} configurations...")
+
+    # Budget against the CPUs this process may actually use: startup pins
+    # the process to THREADS cores, so os.cpu_count() would overcount.
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    widest = max(THREADS_LIST) or cores  # threads=0 means "all cores" to CT2
+    workers = max(1, min(len(CONFIG_OBJS), cores // widest))
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(lambda cfg: transcribe(audio, cfg), CONFIG_OBJS))
+    else:
+        results = [transcribe(audio, cfg) for cfg in CONFIG_OBJS]
+
+    for idx, (cfg, result) in enumerate(zip(CONFIG_OBJS, results), 1):
+        if result:
+            if SHOW_FOOTER:
+                stats = format_stats_footer(result["duration"], result["elapsed"], cfg)
+                send_message(chat_id, f"🗣️ {result['text']}{stats}")
+            else:
+                send_message(chat_id, f"🗣️ {result['text']}")
+        else:
+            config_label = f"[{idx}/{len(CONFIG_OBJS)}] model={cfg.model_name}, beam={cfg.beam_size}, vad={'on' if cfg.vad_filter else 'off'}, threads={cfg.threads}"
+            send_message(chat_id, f"❌ Failed: {config_label}")
+
+
+def _process_single_config(chat_id, audio):
+    """Transcribe with the primary config, streaming partials into one message."""
+    message_id = send_message_and_get_id(chat_id, "🎤 Transcribing...")
+
+    # A background writer coalesces partial updates through a 1-slot queue:
+    # enqueueing drops the stale partial, so the writer always wakes to the
+    # newest text, edits, then sleeps. At most one POST per interval without
+    # a clock check on every segment.
+    pending = queue.Queue(maxsize=1)
+    done = threading.Event()
+
+    def edit_worker():
+        while not done.is_set() or not pending.empty():
+            try:
+                text = pending.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            while True:  # drop stale partials, keep the latest
+                try:
+                    text = pending.get_nowait()
+                except queue.Empty:
+                    break
+            edit_message(chat_id, message_id, f"🗣️ {text}...")
+            time.sleep(MIN_EDIT_INTERVAL)
+
+    def on_segment(partial_text):
+        # Single producer: after the stale entry is popped the slot is
+        # free, so the second put can't race with another writer
         try:
-            if file_path and os.path.exists(file_path):
-                os.remove(file_path)
-                log.info(f"Cleaned up temp file: {file_path}")
-        except Exception as e:
-            log.warning(f"Failed to clean up {file_path}: {e}")
+            pending.put_nowait(partial_text)
+        except queue.Full:
+            try:
+                pending.get_nowait()
+            except queue.Empty:
+                pass
+            pending.put_nowait(partial_text)
+
+    writer = threading.Thread(target=edit_worker, daemon=True)
+    writer.start()
+    try:
+        result = transcribe(audio, on_segment=on_segment)
+    finally:
+        done.set()
+        writer.join()
+
+    if result:
+        # Final update with optional stats footer
+        if SHOW_FOOTER:
+            stats = format_stats_footer(result["duration"], result["elapsed"])
+            edit_message(chat_id, message_id, f"🗣️ {result['text']}{stats}")
+        else:
+            edit_message(chat_id, message_id, f"🗣️ {result['text']}")
+        # The final reply goes through edit_message, which logs nothing, and
+        # segment lines are DEBUG now: without this line a single-config
+        # session's log ends at "Detected language" and analyze_logs.py
+        # times the transcription as zero. Same text send_message logs, so
+        # the analyzer's session-end event keeps matching.
+        log.info("Sending message")
+    else:
+        log.info("Could not transcribe audio for chat %s", chat_id)
+        edit_message(chat_id, message_id, "❌ Could not transcribe audio.")
+
+
+def process_voice_message(chat_id, file_id, update_id):
+    """Download, decode and transcribe one voice message, then reply."""
+    try:
+        audio = download_and_decode(file_id)
+        if audio is not None:
+            if MULTI_CONFIG_MODE:
+                _process_multi_config(chat_id, audio)
+            else:
+                _process_single_config(chat_id, audio)
+        else:
+            log.error("could not convert")
+        # Persist the offset once the voice pipeline has run; non-voice
+        # updates only ever touch the in-memory copy
+        set_last_update_id(update_id)
+    except Exception as e:
+        log.error(f"Error processing voice message: {e}")
 
 
 def main():
@@ -328,6 +656,12 @@ def main():
     send_startup_message()
     last_update_id = get_last_update_id()
 
+    # The offset lives in memory; disk only sees it after a voice message is
+    # handled and at shutdown. Telegram replays un-ACKed updates on restart,
+    # so at-least-once delivery is preserved.
+    atexit.register(lambda: set_last_update_id(last_update_id, force=True))
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
     while True:
         updates = get_updates(offset=last_update_id + 1 if last_update_id else None)
 
@@ -335,7 +669,6 @@ def main():
             try:
                 update_id = update["update_id"]
                 last_update_id = update_id
-                set_last_update_id(update_id)
 
                 message = update.get("message", {})
                 chat_id = message["chat"]["id"]
@@ -343,78 +676,16 @@ def main():
                 if "voice" in message:
                     log.info("Voice message received")
                     file_id = message["voice"]["file_id"]
-                    voice_file = download_file(file_id)
-                    wav_file = voice_file + ".wav" if voice_file else None
-                    try:
-                        if voice_file:
-                            if convert_oga_to_wav(voice_file, wav_file):
-                                if MULTI_CONFIG_MODE:
-                                    # Multi-config mode: process with all configurations
-                                    log.info(f"Multi-config mode: processing {len(CONFIGS)} configurations")
-                                    send_message(chat_id, f"🎤 Processing with {len(CONFIGS)} configurations...")
-                                    
-                                    for idx, (model_name, beam_size, vad_filter, threads) in enumerate(CONFIGS, 1):
-                                        config_label = f"[{idx}/{len(CONFIGS)}] model={model_name}, beam={beam_size}, vad={'on' if vad_filter else 'off'}, threads={threads}"
-                                        log.info(f"Processing config: {config_label}")
-                                        
-                                        result = transcribe(
-                                            wav_file,
-                                            model_name=model_name,
-                                            beam_size=beam_size,
-                                            vad_filter=vad_filter,
-                                            threads=threads
-                                        )
-                                        
-                                        if result:
-                                            if SHOW_FOOTER:
-                                                stats = format_stats_footer(
-                                                    result["duration"], result["elapsed"],
-                                                    model_name=model_name, beam_size=beam_size,
-                                                    vad_filter=vad_filter, threads=threads
-                                                )
-                                                send_message(chat_id, f"🗣️ {result['text']}{stats}")
-                                            else:
-                                                send_message(chat_id, f"🗣️ {result['text']}")
-                                        else:
-                                            send_message(chat_id, f"❌ Failed: {config_label}")
-                                else:
-                                    # Single config mode: streaming with edits
-                                    message_id = send_message_and_get_id(chat_id, "🎤 Transcribing...")
-                                    
-                                    # Track last edit time to avoid rate limits
-                                    last_edit_time = [0]  # Use list to allow mutation in closure
-                                    MIN_EDIT_INTERVAL = 0.5  # 500ms between edits
-                                    
-                                    def on_segment(partial_text):
-                                        now = time.time()
-                                        if now - last_edit_time[0] >= MIN_EDIT_INTERVAL:
-                                            edit_message(chat_id, message_id, f"🗣️ {partial_text}...")
-                                            last_edit_time[0] = now
-                                    
-                                    result = transcribe(wav_file, on_segment=on_segment)
-                                    
-                                    if result:
-                                        # Final update with optional stats footer
-                                        if SHOW_FOOTER:
-                                            stats = format_stats_footer(result["duration"], result["elapsed"])
-                                            edit_message(chat_id, message_id, f"🗣️ {result['text']}{stats}")
-                                        else:
-                                            edit_message(chat_id, message_id, f"🗣️ {result['text']}")
-                                    else:
-                                        log.info(chat_id, "❌ Could not transcribe audio.")
-                                        edit_message(chat_id, message_id, "❌ Could not transcribe audio.")
-                            else:
-                                log.error("could not convert")
-                    finally:
-                        # Clean up temp files after processing
-                        cleanup_temp_files(voice_file, wav_file)
+                    TRANSCRIBE_EXECUTOR.submit(process_voice_message, chat_id, file_id, update_id)
                 else:
                     log.info("Non-voice message, ignoring")
 
             except Exception as e:
                 log.error(f"Error processing update: {e}")
 
-        time.sleep(1)
+        # No inter-poll sleep: getUpdates long-polls with timeout=50, so an
+        # empty window already blocks server-side and a fixed sleep would
+        # only add a latency floor on every message.
 
 
 if __name__ == "__main__":